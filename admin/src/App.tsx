@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Plus, Edit, Trash2, Search, X, Save, Package, DollarSign, Tag, Layers, AlertCircle, CheckCircle } from 'lucide-react';
 import * as api from './api';
 
@@ -10,6 +10,8 @@ export default function AdminProductManagement() {
   const [showModal, setShowModal] = useState<boolean>(false);
   const [editingProduct, setEditingProduct] = useState<api.Product | null>(null);
   const [notification, setNotification] = useState<{ message: string; type: 'success' | 'error' } | null>(null);
+  // Position in the catalog change log; syncs only fetch what changed after it
+  const cursorRef = useRef<string | null>(null);
 
   const [formData, setFormData] = useState<{
     name: string;
@@ -31,17 +33,42 @@ export default function AdminProductManagement() {
     rating: '0'
   });
 
+  // Apply catalog changes since the last sync to the local product list
+  const syncProducts = async () => {
+    let changes: api.ProductChanges;
+    try {
+      changes = await api.getProductChanges(cursorRef.current);
+    } catch (err) {
+      // Cursor expired (or was never set): start again from a full sync
+      cursorRef.current = null;
+      changes = await api.getProductChanges();
+    }
+    const full = cursorRef.current === null;
+    const updates = [...changes.products];
+    const deleted = new Set(changes.deleted);
+    while (changes.has_more) {
+      changes = await api.getProductChanges(changes.cursor);
+      updates.push(...changes.products);
+      changes.deleted.forEach(id => deleted.add(id));
+    }
+    cursorRef.current = changes.cursor;
+    setProducts(current => {
+      const byId = new Map((full ? [] : current).map(p => [p.id, p] as [number, api.Product]));
+      updates.forEach(p => byId.set(p.id, p));
+      deleted.forEach(id => byId.delete(id));
+      return Array.from(byId.values()).sort((a, b) => a.id - b.id);
+    });
+  };
+
   // Load categories and products from backend (fallback to mock data if API fails)
   useEffect(() => {
     let mounted = true;
 
     const load = async () => {
       try {
-        const [cats, prods] = await Promise.all([api.getCategories(), api.getProducts()]);
+        const [cats] = await Promise.all([api.getCategories(), syncProducts()]);
         if (!mounted) return;
         setCategories(cats as any);
-        setProducts(prods as any);
-        console.log('prods', prods);
       } catch (err) {
         console.error('Failed', err);
       }
@@ -133,9 +160,8 @@ export default function AdminProductManagement() {
         showNotification('Product added successfully!', 'success');
       }
 
-      // Refresh list from server
-      const prods = await api.getProducts();
-      setProducts(prods as any);
+      // Fetch only the products that changed since the last sync
+      await syncProducts();
       handleCloseModal();
     } catch (err: any) {
       console.error(err);
@@ -25,6 +25,14 @@ type Product = {
 	rating?: number
 	category?: string
 	category_id?: number
+	updated_at?: string | null
+}
+
+type ProductChanges = {
+	products: Product[]
+	deleted: number[]
+	cursor: string
+	has_more: boolean
 }
 
 async function request<T>(path: string, opts: RequestInit = {}): Promise<T> {
@@ -78,6 +86,11 @@ export async function getProducts(opts?: {
 	return request<Product[]>(`/api/products${q}`)
 }
 
+// Catalog delta sync: omit `since` for a full sync, then pass back the cursor
+export async function getProductChanges(since?: string | null): Promise<ProductChanges> {
+	return request<ProductChanges>(`/api/products/changes${qs({ since })}`)
+}
+
 export async function getProduct(id: number): Promise<Product> {
 	return request<Product>(`/api/products/${id}`)
 }
@@ -149,12 +162,13 @@ export async function healthCheck() {
 	return request<{ status: string }>(`/api/health`)
 }
 
-export type { Product, Category }
+export type { Product, Category, ProductChanges }
 
 export default {
 	getCategories,
 	createCategory,
 	getProducts,
+	getProductChanges,
 	getProduct,
 	createProduct,
 	updateProduct,
@@ -0,0 +1,456 @@
+"""
+ASGI entry point with an async read path.
+
+The read-heavy endpoints (product listing and detail, categories, cart,
+wishlist, order history and the account dashboard) are served here on an
+async SQLAlchemy engine, so a slow query parks a coroutine instead of holding
+a worker thread. They run the same statement builders and serializers as the
+Flask views in app.py and return identical responses. The product change
+stream (GET /api/products/stream) is served here too, waiting on the change
+broker from the event loop, so an open stream does not pin a thread.
+
+Everything else is handed to the regular Flask app through asgiref's
+WsgiToAsgi adapter, which runs it in a thread pool. That includes writes,
+other endpoints, CORS preflights, and any read that has to answer with an
+error (404, 400). With USER_SHARDS set, the /api/users/<id>/... reads go to
+Flask as well, since the async engine only covers the main database.
+
+Usage:
+  pip install -r requirements-asgi.txt
+  uvicorn asgi:application --host 0.0.0.0 --port 8000 --workers 4
+
+The async engine URL is derived from DATABASE_URL (postgresql:// becomes
+postgresql+asyncpg://, sqlite:// becomes sqlite+aiosqlite://) unless
+ASYNC_DATABASE_URL is set.
+"""
+import asyncio
+import os
+import re
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from werkzeug.datastructures import MultiDict
+
+from app import (
+    CART_PRODUCT_FIELDS,
+    CORS_EXPOSE_HEADERS,
+    CORS_ORIGINS,
+    WISHLIST_FIELDS,
+    EncodedBody,
+    app,
+    attach_dashboard_products,
+    attach_products,
+    cart_product_columns,
+    cart_statement,
+    catalog_cache_peek,
+    catalog_cache_put,
+    categories_statement,
+    change_broker,
+    choose_encoding,
+    configure_sqlite_engine,
+    current_catalog_snapshot,
+    dashboard_plan,
+    dashboard_product_ids,
+    facet_statement,
+    facets_cache_key,
+    field_columns,
+    format_sse,
+    item_products_statement,
+    listing_cache_key,
+    listings_statement,
+    live_stock_ids,
+    parse_dashboard_include,
+    parse_fields,
+    order_page_statement,
+    parse_order_page,
+    parse_product_filters,
+    parse_product_ids,
+    product_changes_statement,
+    product_statement,
+    product_version_statement,
+    serialize_cart,
+    serialize_categories,
+    serialize_dashboard,
+    serialize_listings,
+    serialize_order_page,
+    serialize_product,
+    serialize_product_change,
+    serialize_wishlist,
+    shard_totals_statement,
+    snapshot_etag,
+    summarize_facets,
+    user_shard_ring,
+    warm_up,
+    wishlist_statement,
+)
+
+
+def async_database_url(url):
+    """Map a sync SQLAlchemy URL onto its async driver."""
+    scheme, sep, rest = url.partition("://")
+    driver = scheme.split("+")[0]
+    if driver in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if driver == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+
+def create_engine_for_app():
+    url = os.getenv("ASYNC_DATABASE_URL") or async_database_url(
+        app.config["SQLALCHEMY_DATABASE_URI"]
+    )
+    options = {}
+    if not url.startswith("sqlite"):
+        # Coroutines are cheap; connections are what bounds concurrency now
+        options["pool_size"] = int(os.getenv("ASYNC_POOL_SIZE", 20))
+        options["max_overflow"] = int(os.getenv("ASYNC_POOL_OVERFLOW", 20))
+        options["pool_pre_ping"] = True
+    engine = create_async_engine(url, **options)
+    configure_sqlite_engine(engine.sync_engine)
+    return engine
+
+
+async def _shard_totals(session, product_ids):
+    if not product_ids:
+        return {}
+    rows = (await session.execute(shard_totals_statement(product_ids))).all()
+    return {pid: int(total or 0) for pid, total in rows}
+
+
+async def _with_products(session, stmt, columns):
+    rows = (await session.execute(stmt)).all()
+    ids = sorted({row.product_id for row in rows})
+    if not ids:
+        return []
+    products = (await session.execute(item_products_statement(ids, columns))).all()
+    return attach_products(rows, products)
+
+
+def _snapshot_listings(filters):
+    snapshot = current_catalog_snapshot()
+    return snapshot.listings(filters) if snapshot is not None else None
+
+
+def _snapshot_product(product_id):
+    snapshot = current_catalog_snapshot()
+    found = snapshot.product(product_id) if snapshot is not None else None
+    return (*found, snapshot) if found else None
+
+
+# Each handler returns (payload, extra headers), or None to let Flask answer.
+# The payload may be an EncodedBody that is already serialized.
+
+
+async def get_categories(session, args):
+    rows = (await session.execute(categories_statement())).all()
+    return serialize_categories(rows), {}
+
+
+async def get_products(session, args):
+    try:
+        filters = parse_product_filters(args)
+    except ValueError:
+        return None
+    # Same body cache as the Flask view, so either path may fill it
+    ttl = app.config["CATALOG_BODY_TTL_SECONDS"]
+    key = ("body", *listing_cache_key(filters))
+    cached = catalog_cache_peek(key) if ttl else None
+    if cached is not None:
+        return cached, {}
+    # Mapping and scanning the snapshot is plain Python over the whole
+    # catalog, so it runs in a thread rather than on the event loop
+    found = await asyncio.to_thread(_snapshot_listings, filters)
+    if found is not None:
+        result, sharded = found
+        live = await _shard_totals(session, [product_id for _, product_id in sharded])
+        for n, product_id in sharded:
+            result[n]["stock"] = live.get(product_id, result[n]["stock"])
+    else:
+        listings = (await session.execute(listings_statement(filters))).all()
+        result = serialize_listings(
+            listings,
+            await _shard_totals(session, live_stock_ids(listings)),
+            filters["fields"],
+        )
+    payload = result
+    if filters["facets"]:
+        facets_key = facets_cache_key(filters)
+        facets = catalog_cache_peek(facets_key)
+        if facets is None:
+            stmt = facet_statement(filters["search"], filters["in_stock"])
+            facets = summarize_facets((await session.execute(stmt)).all())
+            catalog_cache_put(facets_key, facets)
+        payload = {"products": result, "facets": facets}
+    if not ttl:
+        return payload, {}
+    body = await asyncio.to_thread(EncodedBody, payload)
+    catalog_cache_put(key, body, ttl)
+    return body, {}
+
+
+async def get_product(session, args, product_id):
+    found = await asyncio.to_thread(_snapshot_product, product_id)
+    if found:
+        payload, sharded, snapshot = found
+        if sharded:
+            live = await _shard_totals(session, [product_id])
+            payload["stock"] = live.get(product_id, 0)
+        version = await session.scalar(product_version_statement(product_id))
+        if version is None:
+            return payload, {}
+        return payload, {"ETag": f'"{snapshot_etag(version, snapshot)}"'}
+    row = (await session.execute(product_statement(product_id))).first()
+    if not row:
+        return None
+    live = await _shard_totals(session, live_stock_ids([row]))
+    return serialize_product(row, live), {"ETag": f'"{row.version}"'}
+
+
+async def get_cart(session, args, user_id):
+    try:
+        fields = parse_fields(args, CART_PRODUCT_FIELDS)
+    except ValueError:
+        return None
+    rows = await _with_products(
+        session, cart_statement(user_id), cart_product_columns(fields)
+    )
+    live = await _shard_totals(session, live_stock_ids(rows))
+    return serialize_cart(rows, live, fields), {}
+
+
+async def get_wishlist(session, args, user_id):
+    try:
+        fields = parse_fields(args, WISHLIST_FIELDS)
+    except ValueError:
+        return None
+    rows = await _with_products(
+        session, wishlist_statement(user_id), field_columns(WISHLIST_FIELDS, fields)
+    )
+    live = await _shard_totals(session, live_stock_ids(rows))
+    return serialize_wishlist(rows, live, fields), {}
+
+
+async def get_user_orders(session, args, user_id):
+    try:
+        page = parse_order_page(args)
+    except ValueError:
+        return None
+    rows = (await session.execute(order_page_statement(user_id, page))).all()
+    payload, next_cursor = serialize_order_page(rows, page["limit"])
+    return payload, ({"X-Next-Cursor": next_cursor} if next_cursor else {})
+
+
+async def get_user_dashboard(session, args, user_id):
+    try:
+        include = parse_dashboard_include(args)
+        plan = dashboard_plan(user_id, include, args)
+    except ValueError:
+        return None
+
+    async def fetch(stmt):
+        # Sections run concurrently, each on its own connection
+        async with AsyncSession(session.bind) as own:
+            return (await own.execute(stmt)).all()
+
+    rows = await asyncio.gather(*(fetch(stmt) for stmt in plan.values()))
+    results = dict(zip(plan, rows))
+    results["user"] = results["user"][0] if results["user"] else None
+    if results["user"] is None:
+        return None
+    ids = dashboard_product_ids(results)
+    if ids:
+        products = (await session.execute(item_products_statement(ids))).all()
+        attach_dashboard_products(results, products)
+    live = await _shard_totals(
+        session, live_stock_ids(results.get("cart", []) + results.get("wishlist", []))
+    )
+    limit = parse_order_page(args)["limit"]
+    return serialize_dashboard(include, results, live, limit), {}
+
+
+ROUTES = [
+    (re.compile(r"^/api/categories$"), get_categories),
+    (re.compile(r"^/api/products$"), get_products),
+    (re.compile(r"^/api/products/(?P<product_id>\d+)$"), get_product),
+    (re.compile(r"^/api/users/(?P<user_id>\d+)/cart$"), get_cart),
+    (re.compile(r"^/api/users/(?P<user_id>\d+)/wishlist$"), get_wishlist),
+    (re.compile(r"^/api/users/(?P<user_id>\d+)/orders$"), get_user_orders),
+    (re.compile(r"^/api/users/(?P<user_id>\d+)/dashboard$"), get_user_dashboard),
+]
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def stream_product_changes(scope, receive, send, sessions, args):
+    """Native twin of the Flask SSE view. Returns False to let Flask answer
+    (bad product_ids, or SSE_MAX_CLIENTS reached)."""
+    try:
+        product_ids = parse_product_ids(args)
+    except ValueError:
+        return False
+    q = change_broker.subscribe(product_ids, loop=asyncio.get_running_loop())
+    if q is None:
+        return False
+    pending = []
+    try:
+        initial = []
+        if product_ids:
+            # The session is closed again before streaming starts
+            async with sessions() as session:
+                stmt = product_changes_statement(product_ids)
+                initial = [
+                    serialize_product_change(row)
+                    for row in (await session.execute(stmt)).all()
+                ]
+        heartbeat = app.config["SSE_HEARTBEAT_SECONDS"]
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream; charset=utf-8"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                    *_cors_headers(scope),
+                ],
+            }
+        )
+
+        async def push(chunk):
+            message = {"type": "http.response.body", "more_body": True}
+            await send({**message, "body": chunk.encode()})
+
+        await push(f"retry: {heartbeat * 1000}\n\n")
+        event_id = 0
+        for event in initial:
+            event_id += 1
+            await push(format_sse(event_id, event))
+        disconnect = asyncio.ensure_future(_wait_for_disconnect(receive))
+        pending.append(disconnect)
+        get = None
+        while True:
+            if get is None:
+                get = asyncio.ensure_future(q.get())
+                pending.append(get)
+            done, _ = await asyncio.wait(
+                {get, disconnect},
+                timeout=heartbeat,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if disconnect in done:
+                return True
+            if get in done:
+                event_id += 1
+                await push(format_sse(event_id, get.result()))
+                pending.remove(get)
+                get = None
+            else:
+                await push(": keep-alive\n\n")
+    finally:
+        for task in pending:
+            task.cancel()
+        change_broker.unsubscribe(q)
+
+
+def _cors_headers(scope):
+    origin = dict(scope["headers"]).get(b"origin", b"").decode()
+    if origin not in CORS_ORIGINS:
+        return []
+    return [
+        (b"access-control-allow-origin", origin.encode()),
+        (b"access-control-allow-credentials", b"true"),
+        (b"access-control-expose-headers", ", ".join(CORS_EXPOSE_HEADERS).encode()),
+        (b"vary", b"Origin"),
+    ]
+
+
+async def _send_json(scope, send, status, payload, headers):
+    # Serialize and compress as the Flask app does, so bodies match the sync path
+    if not isinstance(payload, EncodedBody):
+        payload = EncodedBody(payload)
+    encoding = None
+    if payload.compressible:
+        accept = dict(scope["headers"]).get(b"accept-encoding", b"").decode()
+        encoding = choose_encoding(accept)
+    if encoding:
+        # A variant not built yet is compressed off the event loop
+        encoding, body = await asyncio.to_thread(payload.variant, encoding)
+    else:
+        encoding, body = payload.variant(None)
+    minimum = app.config["COMPRESS_MIN_BYTES"]
+    raw_headers = [
+        (b"content-type", b"application/json"),
+        *([(b"content-encoding", encoding.encode())] if encoding else []),
+        *([(b"vary", b"Accept-Encoding")] if minimum else []),
+        (b"content-length", str(len(body)).encode()),
+        *[(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        *_cors_headers(scope),
+    ]
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def create_asgi_app():
+    engine = create_engine_for_app()
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    flask_app = WsgiToAsgi(app)
+
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                if app.config["WARMUP_ENABLED"]:
+                    # Warm the sync side and open the async pool before
+                    # accepting traffic
+                    await asyncio.to_thread(warm_up)
+                    async with engine.connect() as conn:
+                        await conn.exec_driver_sql("SELECT 1")
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def application(scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await lifespan(receive, send)
+        if scope["type"] == "http" and scope["method"] == "GET":
+            if scope["path"] == "/api/products/stream":
+                args = MultiDict(
+                    parse_qsl(scope["query_string"].decode(), keep_blank_values=True)
+                )
+                if await stream_product_changes(scope, receive, send, sessions, args):
+                    return
+            for pattern, handler in ROUTES:
+                match = pattern.match(scope["path"])
+                if not match:
+                    continue
+                args = MultiDict(
+                    parse_qsl(scope["query_string"].decode(), keep_blank_values=True)
+                )
+                params = {k: int(v) for k, v in match.groupdict().items()}
+                if "user_id" in params and user_shard_ring.names:
+                    break
+                try:
+                    async with sessions() as session:
+                        result = await handler(session, args, **params)
+                except Exception:
+                    app.logger.exception("Async handler failed for %s", scope["path"])
+                    return await _send_json(
+                        scope, send, 500, {"error": "Internal server error"}, {}
+                    )
+                if result is not None:
+                    return await _send_json(scope, send, 200, *result)
+                break
+        return await flask_app(scope, receive, send)
+
+    application.engine = engine
+    return application
+
+
+application = create_asgi_app()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Check Idempotency-Key replay, conflicts and reuse after expiry.
+
+Adds a product to a user's cart through the Flask test client with a fresh
+key, retries it, reuses the key for another request, then expires the key and
+checks that it is accepted again. It writes to the cart, so run it against a
+scratch database with some data in it:
+
+  DATABASE_URL=sqlite:///scratch.db \\
+      python scripts/check_idempotency.py --user-id 1 --product-id 1
+"""
+import argparse
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import IdempotencyKey, app, db, user_shard_ring, using_user_shard  # noqa: E402
+
+
+def main(user_id, product_id):
+    client = app.test_client()
+    key = f"check-{uuid.uuid4().hex}"
+    path = f"/api/users/{user_id}/cart"
+    headers = {"Idempotency-Key": key}
+
+    def add(quantity):
+        body = {"product_id": product_id, "quantity": quantity}
+        return client.post(path, json=body, headers=headers)
+
+    def replayed(resp):
+        return resp.headers.get("Idempotent-Replayed") == "true"
+
+    first = add(1)
+    steps = [("first request runs", first.status_code == 201 and not replayed(first))]
+    retry = add(1)
+    steps.append(
+        (
+            "retry replays the response",
+            retry.status_code == 201
+            and replayed(retry)
+            and retry.get_data() == first.get_data(),
+        )
+    )
+    steps.append(("other request with the key gets 422", add(2).status_code == 422))
+
+    with app.app_context(), using_user_shard(user_shard_ring.shard_for(user_id)):
+        IdempotencyKey.query.filter_by(user_id=user_id, key=key).update(
+            {IdempotencyKey.expires_at: datetime.utcnow() - timedelta(seconds=1)}
+        )
+        db.session.commit()
+    reused = add(2)
+    steps.append(
+        (
+            "expired key runs the new request",
+            reused.status_code == 201 and not replayed(reused),
+        )
+    )
+    again = add(2)
+    steps.append(
+        (
+            "retry after reuse replays the new response",
+            replayed(again) and again.get_data() == reused.get_data(),
+        )
+    )
+
+    for name, passed in steps:
+        print(f"{'ok  ' if passed else 'FAIL'} {name}")
+    return sum(not passed for _, passed in steps)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--product-id", type=int, default=1)
+    args = parser.parse_args()
+    sys.exit(1 if main(args.user_id, args.product_id) else 0)
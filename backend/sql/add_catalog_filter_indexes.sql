@@ -0,0 +1,13 @@
+BEGIN;
+
+-- Server-side catalog filters and sorts on GET /api/products
+CREATE INDEX IF NOT EXISTS ix_products_category_price
+ON products (category_id, price);
+
+CREATE INDEX IF NOT EXISTS ix_products_price ON products (price);
+
+CREATE INDEX IF NOT EXISTS ix_products_rating ON products (rating);
+
+CREATE INDEX IF NOT EXISTS ix_products_created_at ON products (created_at);
+
+COMMIT;
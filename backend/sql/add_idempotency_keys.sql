@@ -0,0 +1,21 @@
+BEGIN;
+
+-- Idempotency-Key support for checkout and cart adds: the request hash and
+-- the response of each keyed write, replayed when the client retries
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    key VARCHAR(255) NOT NULL,
+    request_hash VARCHAR(64) NOT NULL,
+    status_code INTEGER,
+    response_body TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    expires_at TIMESTAMP NOT NULL,
+    CONSTRAINT _idempotency_user_key_uc UNIQUE (user_id, key)
+);
+
+-- `flask retention` deletes expired keys
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at
+ON idempotency_keys (expires_at);
+
+COMMIT;
@@ -0,0 +1,10 @@
+BEGIN;
+
+-- Keyset pagination of a user's order history on (created_at, id)
+CREATE INDEX IF NOT EXISTS ix_orders_user_created_id
+ON orders (user_id, created_at, id);
+
+-- Per-order item counts and lookups
+CREATE INDEX IF NOT EXISTS ix_order_items_order_id ON order_items (order_id);
+
+COMMIT;
@@ -0,0 +1,17 @@
+-- order_items.created_at: a copy of the order's created_at.
+--
+-- Order history counts items on (order_id, created_at) so that, once the
+-- tables are partitioned, the count is pruned to the order's month. Items
+-- without the copy would count as zero, so every deployment needs this,
+-- partitioned or not. Safe to re-run; run it against every user shard too.
+
+BEGIN;
+
+ALTER TABLE order_items ADD COLUMN IF NOT EXISTS created_at TIMESTAMP;
+
+UPDATE order_items oi
+SET created_at = o.created_at
+FROM orders o
+WHERE o.id = oi.order_id AND oi.created_at IS NULL;
+
+COMMIT;
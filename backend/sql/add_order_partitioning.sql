@@ -0,0 +1,105 @@
+-- Monthly range partitioning of orders and order_items by created_at.
+--
+-- Rebuilds both tables as partitioned tables and copies the existing rows
+-- over; the old tables are kept as orders_unpartitioned and
+-- order_items_unpartitioned until you drop them. Run once, during a quiet
+-- period (the copy holds locks on both tables). Requires Postgres 12+.
+
+BEGIN;
+
+-- Every row needs a partition key. Items carry their order's, copied by
+-- add_order_item_created_at.sql, which must have run first.
+UPDATE orders SET created_at = NOW() WHERE created_at IS NULL;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM order_items WHERE created_at IS NULL) THEN
+        RAISE EXCEPTION 'Run sql/add_order_item_created_at.sql first';
+    END IF;
+END $$;
+
+-- Move the old tables (and their index/constraint names) out of the way
+ALTER TABLE order_items RENAME TO order_items_unpartitioned;
+ALTER TABLE order_items_unpartitioned
+RENAME CONSTRAINT order_items_pkey TO order_items_unpartitioned_pkey;
+ALTER INDEX IF EXISTS ix_order_items_order_id
+RENAME TO ix_order_items_unpartitioned_order_id;
+
+ALTER TABLE orders RENAME TO orders_unpartitioned;
+ALTER TABLE orders_unpartitioned
+RENAME CONSTRAINT orders_pkey TO orders_unpartitioned_pkey;
+ALTER INDEX IF EXISTS ix_orders_user_created_id
+RENAME TO ix_orders_unpartitioned_user_created_id;
+
+CREATE TABLE orders (
+    LIKE orders_unpartitioned INCLUDING DEFAULTS,
+    PRIMARY KEY (id, created_at),
+    FOREIGN KEY (user_id) REFERENCES users (id)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE order_items (
+    LIKE order_items_unpartitioned INCLUDING DEFAULTS,
+    PRIMARY KEY (id, created_at),
+    FOREIGN KEY (order_id, created_at) REFERENCES orders (id, created_at),
+    FOREIGN KEY (product_id) REFERENCES products (id)
+) PARTITION BY RANGE (created_at);
+
+-- Keep the id sequences when the old tables are dropped
+ALTER SEQUENCE orders_id_seq OWNED BY orders.id;
+ALTER SEQUENCE order_items_id_seq OWNED BY order_items.id;
+
+-- Rows outside every monthly partition land here; keep it empty by creating
+-- months ahead of time
+CREATE TABLE orders_default PARTITION OF orders DEFAULT;
+CREATE TABLE order_items_default PARTITION OF order_items DEFAULT;
+
+-- Creates orders_pYYYYMM / order_items_pYYYYMM for every month from
+-- first_month through months_ahead months after the current one. Returns the
+-- number of months added. Called by `flask retention`.
+CREATE OR REPLACE FUNCTION ensure_order_partitions(first_month DATE, months_ahead INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    month DATE := date_trunc('month', first_month)::date;
+    last_month DATE := (date_trunc('month', NOW()) + make_interval(months => months_ahead))::date;
+    suffix TEXT;
+    created INTEGER := 0;
+BEGIN
+    WHILE month <= last_month LOOP
+        suffix := to_char(month, 'YYYYMM');
+        IF to_regclass('orders_p' || suffix) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF orders FOR VALUES FROM (%L) TO (%L)',
+                'orders_p' || suffix, month, (month + INTERVAL '1 month')::date
+            );
+            created := created + 1;
+        END IF;
+        IF to_regclass('order_items_p' || suffix) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF order_items FOR VALUES FROM (%L) TO (%L)',
+                'order_items_p' || suffix, month, (month + INTERVAL '1 month')::date
+            );
+        END IF;
+        month := (month + INTERVAL '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_order_partitions(
+    COALESCE((SELECT MIN(created_at) FROM orders_unpartitioned), NOW())::date, 3
+);
+
+INSERT INTO orders SELECT * FROM orders_unpartitioned;
+INSERT INTO order_items SELECT * FROM order_items_unpartitioned;
+
+-- Indexes on the parents are created on every partition
+CREATE INDEX ix_orders_user_created_id ON orders (user_id, created_at, id);
+CREATE INDEX ix_order_items_order_id ON order_items (order_id, created_at);
+
+-- Abandoned-cart retention scans cart_items by age
+CREATE INDEX IF NOT EXISTS ix_cart_items_updated_at ON cart_items (updated_at);
+
+-- Old months detached by `flask retention --archive-after-months` go here
+CREATE SCHEMA IF NOT EXISTS archive;
+
+COMMIT;
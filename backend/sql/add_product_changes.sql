@@ -0,0 +1,14 @@
+BEGIN;
+
+-- Catalog change log for GET /api/products/changes: one row per product
+-- whose listing changed, appended in the writer's transaction
+CREATE TABLE IF NOT EXISTS product_changes (
+    id SERIAL PRIMARY KEY,
+    product_id INTEGER NOT NULL,
+    changed_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_product_changes_changed_at
+ON product_changes (changed_at);
+
+COMMIT;
@@ -0,0 +1,39 @@
+BEGIN;
+
+-- Denormalized read model behind GET /api/products
+CREATE TABLE IF NOT EXISTS product_listings (
+    product_id INTEGER PRIMARY KEY REFERENCES products (id),
+    name VARCHAR(200) NOT NULL,
+    description TEXT,
+    price DOUBLE PRECISION NOT NULL,
+    unit VARCHAR(20) NOT NULL,
+    stock INTEGER DEFAULT 0,
+    stock_shards INTEGER DEFAULT 0,
+    in_stock BOOLEAN DEFAULT FALSE,
+    image_url VARCHAR(500),
+    rating DOUBLE PRECISION DEFAULT 0,
+    category_id INTEGER NOT NULL,
+    category_name VARCHAR(100) NOT NULL,
+    category_slug VARCHAR(100) NOT NULL,
+    search_text TEXT,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_product_listings_category_price
+ON product_listings (category_slug, price);
+
+CREATE INDEX IF NOT EXISTS ix_product_listings_price ON product_listings (price);
+
+CREATE INDEX IF NOT EXISTS ix_product_listings_rating ON product_listings (rating);
+
+CREATE INDEX IF NOT EXISTS ix_product_listings_created_at
+ON product_listings (created_at);
+
+-- Substring search on search_text (LIKE '%term%') via trigrams
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_product_listings_search_trgm
+ON product_listings USING gin (search_text gin_trgm_ops);
+
+COMMIT;
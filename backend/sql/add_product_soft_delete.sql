@@ -0,0 +1,15 @@
+BEGIN;
+
+-- Soft delete for products: DELETE /api/products/<id> now clears this flag
+-- instead of removing the row that carts, wishlists and orders reference
+ALTER TABLE products
+ADD COLUMN IF NOT EXISTS is_active BOOLEAN NOT NULL DEFAULT TRUE;
+
+-- Partial indexes: catalog reads only ever touch active products
+CREATE INDEX IF NOT EXISTS ix_products_active_category
+ON products (category_id, id) WHERE is_active;
+
+CREATE INDEX IF NOT EXISTS ix_products_active_id
+ON products (id) WHERE is_active;
+
+COMMIT;
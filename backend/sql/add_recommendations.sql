@@ -0,0 +1,27 @@
+BEGIN;
+
+-- Positions of incremental batch processors (last order id consumed, ...)
+CREATE TABLE IF NOT EXISTS batch_cursors (
+    name VARCHAR(100) PRIMARY KEY,
+    position INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Sparse co-occurrence counts, stored in both directions
+CREATE TABLE IF NOT EXISTS product_pair_counts (
+    product_id INTEGER NOT NULL,
+    related_id INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (product_id, related_id)
+);
+
+-- Top-K "frequently bought together" list per product
+CREATE TABLE IF NOT EXISTS product_recommendations (
+    product_id INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    related_id INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (product_id, rank)
+);
+
+COMMIT;
@@ -0,0 +1,17 @@
+BEGIN;
+
+-- Row versions for optimistic concurrency: every update through the API
+-- compares and bumps them (UPDATE ... WHERE id = ? AND version = ?)
+ALTER TABLE users
+ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+ALTER TABLE products
+ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+ALTER TABLE cart_items
+ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+ALTER TABLE addresses
+ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+COMMIT;
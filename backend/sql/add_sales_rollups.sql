@@ -0,0 +1,29 @@
+BEGIN;
+
+-- Incrementally maintained sales rollups for the admin analytics endpoints
+CREATE TABLE IF NOT EXISTS sales_daily (
+    day DATE PRIMARY KEY,
+    revenue NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    units INTEGER NOT NULL DEFAULT 0,
+    orders INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS sales_daily_category (
+    day DATE NOT NULL,
+    category_id INTEGER NOT NULL,
+    revenue NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    units INTEGER NOT NULL DEFAULT 0,
+    orders INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, category_id)
+);
+
+CREATE TABLE IF NOT EXISTS sales_daily_product (
+    day DATE NOT NULL,
+    product_id INTEGER NOT NULL,
+    revenue NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    units INTEGER NOT NULL DEFAULT 0,
+    orders INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, product_id)
+);
+
+COMMIT;
@@ -0,0 +1,21 @@
+BEGIN;
+
+-- Opt-in sharded stock counters for hot products (0 = single products.stock row)
+ALTER TABLE products
+ADD COLUMN IF NOT EXISTS stock_shards INTEGER DEFAULT 0;
+
+UPDATE products
+SET
+    stock_shards = 0
+WHERE
+    stock_shards IS NULL;
+
+-- One row per stock slot; checkout decrements a single random slot
+CREATE TABLE IF NOT EXISTS product_stock_shards (
+    product_id INTEGER NOT NULL REFERENCES products (id),
+    slot INTEGER NOT NULL,
+    stock INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (product_id, slot)
+);
+
+COMMIT;
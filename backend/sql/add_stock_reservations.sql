@@ -0,0 +1,22 @@
+BEGIN;
+
+-- Time-bounded stock holds taken by cart adds and converted at checkout
+CREATE TABLE IF NOT EXISTS stock_reservations (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users (id),
+    product_id INTEGER NOT NULL REFERENCES products (id),
+    quantity INTEGER NOT NULL,
+    expires_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    CONSTRAINT _reservation_user_product_uc UNIQUE (user_id, product_id)
+);
+
+-- Covering index for the available-to-promise SUM per product
+CREATE INDEX IF NOT EXISTS ix_stock_reservations_product_expires
+ON stock_reservations (product_id, expires_at, quantity);
+
+-- Lets the sweeper find expired holds without scanning
+CREATE INDEX IF NOT EXISTS ix_stock_reservations_expires_at
+ON stock_reservations (expires_at);
+
+COMMIT;
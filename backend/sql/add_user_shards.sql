@@ -0,0 +1,24 @@
+BEGIN;
+
+-- Global order ids and owners. With USER_SHARDS set, orders live on their
+-- user's shard and this table (on the main database) allocates their ids
+CREATE TABLE IF NOT EXISTS order_directory (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_order_directory_user_id
+ON order_directory (user_id);
+
+-- Existing orders keep their ids; new ones continue after them
+INSERT INTO order_directory (id, user_id, created_at)
+SELECT id, user_id, created_at FROM orders
+ON CONFLICT (id) DO NOTHING;
+
+SELECT setval(
+    pg_get_serial_sequence('order_directory', 'id'),
+    GREATEST((SELECT MAX(id) FROM order_directory), 1)
+);
+
+COMMIT;